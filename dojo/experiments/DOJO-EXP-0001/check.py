@@ -17,7 +17,14 @@ import re
 import sys
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import List, Set, Tuple
+from typing import Dict, List, Tuple
+
+
+# Compiled once at module scope; these run on every scan of server.ts
+_NAME_RE = re.compile(r"name:\s*['\"]([^'\"]+)['\"]")
+_CASE_RE = re.compile(r"case\s+['\"]([^'\"]+)['\"]:")
+_LIST_SECTION_RE = re.compile(r'ListToolsRequestSchema.*?tools:\s*\[', re.DOTALL)
+_CALL_SECTION_RE = re.compile(r'CallToolRequestSchema.*?switch\s*\(', re.DOTALL)
 
 
 @dataclass
@@ -32,74 +39,67 @@ class Violation:
     snippet: str = ""
 
 
-def extract_tool_definitions(content: str) -> Set[str]:
-    """Extract tool names from ListToolsRequestSchema handler."""
-    tools = set()
-    # Match patterns like: name: 'tool_name' or name: "tool_name"
-    pattern = r"name:\s*['\"]([^'\"]+)['\"]"
+def extract_tool_definitions(content: str) -> Dict[str, int]:
+    """Extract tool names from ListToolsRequestSchema handler, mapped to line numbers."""
+    tools = {}
 
     # Find the ListToolsRequestSchema section
-    list_match = re.search(r'ListToolsRequestSchema.*?tools:\s*\[', content, re.DOTALL)
+    list_match = _LIST_SECTION_RE.search(content)
     if not list_match:
         return tools
 
-    # Find the end of the tools array (matching closing bracket)
+    # Find the end of the tools array (matching closing bracket).
+    # str.find jumps between brackets in C instead of stepping through
+    # every character in Python.
     start = list_match.end()
+    pos = start
     bracket_count = 1
     end = start
-    for i, char in enumerate(content[start:]):
-        if char == '[':
+    while bracket_count:
+        next_open = content.find('[', pos)
+        next_close = content.find(']', pos)
+        if next_close == -1:
+            break
+        if next_open != -1 and next_open < next_close:
             bracket_count += 1
-        elif char == ']':
+            pos = next_open + 1
+        else:
             bracket_count -= 1
             if bracket_count == 0:
-                end = start + i
-                break
-
-    tools_section = content[start:end]
+                end = next_close
+            pos = next_close + 1
 
-    for match in re.finditer(pattern, tools_section):
-        tools.add(match.group(1))
+    # Matches like: name: 'tool_name' or name: "tool_name" (the compiled
+    # pattern scans the section in place via pos/endpos, no slice copy)
+    for match in _NAME_RE.finditer(content, start, end):
+        # Line number computed from the match offset; counting newlines
+        # is one C-level pass instead of re-splitting the file per tool.
+        line = content.count('\n', 0, match.start()) + 1
+        tools.setdefault(match.group(1), line)
 
     return tools
 
 
-def extract_case_handlers(content: str) -> Set[str]:
-    """Extract case labels from CallToolRequestSchema handler."""
-    handlers = set()
-
-    # Match patterns like: case 'tool_name': or case "tool_name":
-    pattern = r"case\s+['\"]([^'\"]+)['\"]:"
+def extract_case_handlers(content: str) -> Dict[str, int]:
+    """Extract case labels from CallToolRequestSchema handler, mapped to line numbers."""
+    handlers = {}
 
     # Find the CallToolRequestSchema section
-    call_match = re.search(r'CallToolRequestSchema.*?switch\s*\(', content, re.DOTALL)
+    call_match = _CALL_SECTION_RE.search(content)
     if not call_match:
         return handlers
 
     # Find content after the switch
     start = call_match.end()
 
-    # Extract case statements from switch block
-    for match in re.finditer(pattern, content[start:]):
-        handlers.add(match.group(1))
+    # Extract case statements (case 'tool_name': or case "tool_name":)
+    for match in _CASE_RE.finditer(content, start):
+        line = content.count('\n', 0, match.start()) + 1
+        handlers.setdefault(match.group(1), line)
 
     return handlers
 
 
-def find_line_number(content: str, tool_name: str, section: str) -> int:
-    """Find the line number where a tool is defined/handled."""
-    lines = content.split('\n')
-    pattern = f"['\"]?{re.escape(tool_name)}['\"]?"
-
-    in_section = False
-    for i, line in enumerate(lines, 1):
-        if section in line:
-            in_section = True
-        if in_section and re.search(pattern, line):
-            return i
-    return 0
-
-
 def run_check(root_path: Path) -> Tuple[List[Violation], str]:
     """
     Run the validation check.
@@ -132,20 +132,20 @@ def run_check(root_path: Path) -> Tuple[List[Violation], str]:
     content = server_path.read_text()
     rel_path = str(server_path.relative_to(root_path) if server_path.is_relative_to(root_path) else server_path)
 
-    # Extract definitions and handlers
-    definitions = extract_tool_definitions(content)
-    handlers = extract_case_handlers(content)
+    # Extract definitions and handlers (name -> line number)
+    defs_map = extract_tool_definitions(content)
+    handlers_map = extract_case_handlers(content)
 
     # Find mismatches
-    defined_not_handled = definitions - handlers
-    handled_not_defined = handlers - definitions
+    defined_not_handled = set(defs_map) - set(handlers_map)
+    handled_not_defined = set(handlers_map) - set(defs_map)
 
     # Skip 'default' if present (it's a valid case label but not a tool)
     handled_not_defined.discard('default')
 
     # Report tools defined but not handled
     for tool in sorted(defined_not_handled):
-        line = find_line_number(content, tool, 'ListToolsRequestSchema')
+        line = defs_map[tool]
         violations.append(Violation(
             rule_id="DOJO-EXP-0001-001",
             file=rel_path,
@@ -158,7 +158,7 @@ def run_check(root_path: Path) -> Tuple[List[Violation], str]:
 
     # Report handlers without definitions
     for tool in sorted(handled_not_defined):
-        line = find_line_number(content, tool, 'CallToolRequestSchema')
+        line = handlers_map[tool]
         violations.append(Violation(
             rule_id="DOJO-EXP-0001-002",
             file=rel_path,
@@ -0,0 +1,39 @@
+"""
+Offline FP16 export for the intent classifier's ONNX model.
+
+The MiniLM forward pass is memory-bandwidth-bound on CPU; FP16 weights
+halve the bytes loaded per layer and typically give ~1.5-2x lower latency
+even on AVX2-only hosts where the INT8/VNNI model has no fast kernels.
+
+Usage:
+    python3 src/ml/export_fp16_onnx.py <model.onnx> [output.onnx]
+
+Run once against the exported all-MiniLM-L6-v2 model.onnx, then place the
+output at onnx/model_fp16.onnx inside the model directory and start the
+classifier with DECIBEL_ST_BACKEND=onnx-fp16.
+"""
+
+import sys
+from pathlib import Path
+
+from onnxruntime.transformers.optimizer import optimize_model
+
+
+def export_fp16(model_path: str, output_path: str):
+    # all-MiniLM-L6-v2: 12 attention heads, 384 hidden dims
+    opt_model = optimize_model(model_path, 'bert', num_heads=12, hidden_size=384)
+    opt_model.convert_float_to_float16()
+    opt_model.save_model_to_file(output_path)
+    print(f"Saved FP16 model to {output_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    model_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else str(
+        Path(model_path).with_name("model_fp16.onnx")
+    )
+    export_fp16(model_path, output_path)
@@ -0,0 +1,44 @@
+"""
+Offline INT8 quantization of the intent classifier model for AVX512-VNNI.
+
+Builds the ONNX model with QLinearMatMul kernels targeting the VPDPBUSD
+instruction (4 int8 MACs per cycle per lane) — the path that makes int8
+transformer inference genuinely faster than FP32 on modern Xeon / Intel
+Core. Companion to export_fp16_onnx.py, which covers AVX2-only hosts.
+
+Usage:
+    python3 src/ml/export_int8_onnx.py [output_dir]
+
+The output directory holds model_quantized.onnx plus the tokenizer and
+config files SentenceTransformer needs to load it. Start the classifier
+with DECIBEL_ONNX_MODEL_DIR=<output_dir> to use it instead of the hub's
+pre-quantized file.
+"""
+
+import sys
+
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def export_int8(output_dir: str):
+    # ORTQuantizer needs an exported ONNX model, not a hub id — export
+    # first, then quantize. quantize() writes model_quantized.onnx.
+    model = ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+    quantizer.quantize(save_dir=output_dir, quantization_config=config)
+
+    # SentenceTransformer needs the tokenizer and model config alongside
+    # the ONNX file to load the directory
+    model.config.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(MODEL_ID).save_pretrained(output_dir)
+    print(f"Saved INT8 (VNNI) model to {output_dir}")
+
+
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "models/minilm-vnni"
+    export_int8(output_dir)
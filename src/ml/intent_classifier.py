@@ -12,91 +12,319 @@ Usage:
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import atexit
+import mmap
+import os
+import queue
+import re
+import sys
+import threading
 from pathlib import Path
 import json
 from datetime import datetime
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import List, Tuple, Optional
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # optional; numpy GEMV path is the fallback
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _best_intent(E, q, offsets):
+        """Fused dot-product + per-intent max + argmax over the example matrix.
+
+        One pass, no temporaries — avoids the sims/reduceat allocations
+        that dominate the numpy path on a matrix this small (46x384).
+        cache=True persists the compiled kernel so the JIT cost is paid
+        once per machine, and __init__ warms it before serving.
+        """
+        n_rows = E.shape[0]
+        dim = E.shape[1]
+        n_intents = offsets.shape[0]
+        best_idx = 0
+        best_score = -2.0  # below the cosine lower bound
+        for k in range(n_intents):
+            start = offsets[k]
+            end = offsets[k + 1] if k + 1 < n_intents else n_rows
+            for r in range(start, end):
+                s = 0.0
+                for d in range(dim):
+                    s += E[r, d] * q[d]
+                if s > best_score:
+                    best_score = s
+                    best_idx = k
+        return best_idx, best_score
+else:
+    _best_intent = None
+
+
+class _StaticModelAdapter:
+    """
+    Wraps a model2vec StaticModel behind the SentenceTransformer encode()
+    surface used here (normalize_embeddings / convert_to_numpy kwargs).
+    The model is built with normalize=True so outputs are already
+    unit-norm.
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    def encode(self, sentences, batch_size: int = 32, **_kwargs):
+        return self._model.encode(sentences, batch_size=batch_size)
+
+
+def _ort_session_options():
+    """
+    SessionOptions for the ONNX backend: all graph optimizations (the
+    sentence-transformers default can leave ORT at basic level, eroding
+    the quantization win) and intra-op threads pinned to physical cores —
+    hyperthreads hurt at these tiny sequence lengths. Override the thread
+    count with DECIBEL_ORT_THREADS.
+    """
+    import onnxruntime as ort
+
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    threads = os.environ.get("DECIBEL_ORT_THREADS")
+    if threads:
+        so.intra_op_num_threads = int(threads)
+    else:
+        so.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    return so
+
+
+def _load_model():
+    """
+    Load the embedding model, preferring the ONNX INT8 backend.
+
+    The quantized AVX512-VNNI model is ~2-4x faster per encode() on CPU
+    with negligible accuracy loss. DECIBEL_ST_BACKEND=onnx-fp16 picks the
+    FP16 model (exported offline via export_fp16_onnx.py) for AVX2-only
+    hosts where INT8 has no fast kernels; DECIBEL_ST_BACKEND=torch falls
+    back to the default PyTorch backend.
+
+    DECIBEL_INTENT_STATIC=1 swaps in a model2vec static model distilled
+    from MiniLM (token lookup + mean pool, no transformer layers): ~100x
+    faster on CPU at a ~2-point cosine cost, for edge hardware where even
+    the quantized transformer is too slow. Distill offline with:
+
+        model2vec distill sentence-transformers/all-MiniLM-L6-v2 -o models/minilm-m2v
+    """
+    if os.environ.get("DECIBEL_INTENT_STATIC") == "1":
+        from model2vec import StaticModel
+        path = os.environ.get("DECIBEL_INTENT_STATIC_MODEL", "models/minilm-m2v")
+        return _StaticModelAdapter(StaticModel.from_pretrained(path, normalize=True))
+
+    backend = os.environ.get("DECIBEL_ST_BACKEND", "onnx")
+    if backend == "onnx":
+        # Prefer a locally quantized model (export_int8_onnx.py builds one
+        # with explicit AVX512-VNNI QLinearMatMul kernels via optimum);
+        # otherwise fall back to the hub's pre-quantized file
+        model_dir = os.environ.get("DECIBEL_ONNX_MODEL_DIR")
+        if model_dir:
+            return SentenceTransformer(
+                model_dir,
+                backend="onnx",
+                model_kwargs={
+                    "file_name": "model_quantized.onnx",
+                    "provider": "CPUExecutionProvider",
+                    "session_options": _ort_session_options(),
+                },
+            )
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            backend="onnx",
+            model_kwargs={
+                "file_name": "onnx/model_qint8_avx512_vnni.onnx",
+                "provider": "CPUExecutionProvider",
+                "session_options": _ort_session_options(),
+            },
+        )
+    if backend == "onnx-fp16":
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            backend="onnx",
+            model_kwargs={
+                "file_name": "onnx/model_fp16.onnx",
+                "provider": "CPUExecutionProvider",
+                "session_options": _ort_session_options(),
+            },
+        )
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+# Example phrases for each intent (seed data)
+EXAMPLES = {
+    "add_wish": [
+        "I wish we had",
+        "would be nice if",
+        "can we add",
+        "idea for",
+        "we should build",
+        "it would help if",
+        "we need a way to",
+        "feature request",
+    ],
+    "log_issue": [
+        "there's a bug",
+        "broken",
+        "error when",
+        "fails to",
+        "not working",
+        "crashed",
+        "exception in",
+        "something wrong with",
+    ],
+    "log_friction": [
+        "annoying that",
+        "keeps happening",
+        "painful to",
+        "frustrating",
+        "slows me down",
+        "every time I have to",
+        "tedious",
+        "friction point",
+    ],
+    "log_crit": [
+        "I noticed",
+        "observation",
+        "the design feels",
+        "UI looks",
+        "feels off",
+        "visually",
+        "the layout",
+        "spacing seems",
+    ],
+    "record_learning": [
+        "I learned",
+        "TIL",
+        "figured out",
+        "turns out",
+        "the trick is",
+        "gotcha",
+        "lesson learned",
+        "discovered that",
+    ],
+    "search": [
+        "find",
+        "where is",
+        "show me",
+        "look up",
+        "search for",
+        "what is the status of",
+    ],
+    "ask_oracle": [
+        "what should I work on",
+        "project status",
+        "roadmap",
+        "health check",
+        "priorities",
+        "next actions",
+    ],
+}
+
+# Distinctive phrases (salient unigrams/bigrams from the seed phrases)
+# that settle classification in microseconds instead of the ~20ms
+# transformer pass. Fast-path hits report KEYWORD_CONFIDENCE so they stay
+# distinguishable from model scores in the training log.
+KEYWORD_CONFIDENCE = 0.99
+KEYWORDS = {
+    "feature request": "add_wish",
+    "i wish we had": "add_wish",
+    "would be nice if": "add_wish",
+    "there's a bug": "log_issue",
+    "crashed": "log_issue",
+    "exception in": "log_issue",
+    "not working": "log_issue",
+    "frustrating": "log_friction",
+    "tedious": "log_friction",
+    "friction point": "log_friction",
+    "slows me down": "log_friction",
+    "til": "record_learning",
+    "i learned": "record_learning",
+    "lesson learned": "record_learning",
+    "figured out": "record_learning",
+    "roadmap": "ask_oracle",
+    "next actions": "ask_oracle",
+    "what should i work on": "ask_oracle",
+}
+
+# Word-boundary anchored so short keywords can't match inside longer
+# words ("til" must not fire on "until")
+_KEYWORD_RE = re.compile(
+    r"\b(" + "|".join(re.escape(keyword) for keyword in KEYWORDS) + r")\b"
+)
+
+
+# Process-wide model + example embeddings, shared by every classifier
+# instance: re-creating the singleton for a different data_root must not
+# re-load 80MB of weights or re-encode the seed phrases.
+_SHARED_LOCK = threading.Lock()
+_MODEL = None
+_EXAMPLE_EMBEDDINGS = None  # (intent_names, reduce_idx, all_embs, per-intent views)
+
+
+def _shared_model_state():
+    """Lazily build (once) and return the shared model and example embeddings."""
+    global _MODEL, _EXAMPLE_EMBEDDINGS
+    with _SHARED_LOCK:
+        if _MODEL is None:
+            model = _load_model()
+
+            # Pre-compute embeddings for all examples, stacked into one
+            # pre-normalized matrix so classify() is a single GEMV plus a
+            # reduceat instead of one small matmul (and two norm passes)
+            # per intent. Unit-norm rows mean cosine is a plain dot.
+            intent_names = list(EXAMPLES.keys())
+            counts = [len(EXAMPLES[name]) for name in intent_names]
+            reduce_idx = np.ascontiguousarray(
+                np.concatenate(([0], np.cumsum(counts)[:-1])), dtype=np.int32
+            )
+            # float32 C-order guarantees the GEMV maps onto a single sgemv
+            # BLAS call (usually a no-op cast; sentence-transformers
+            # already returns float32)
+            all_embs = np.ascontiguousarray(
+                model.encode(
+                    [phrase for name in intent_names for phrase in EXAMPLES[name]],
+                    normalize_embeddings=True,
+                ),
+                dtype=np.float32,
+            )
+
+            # Warm the JIT kernel before the first request so no caller
+            # pays compile latency
+            if _best_intent is not None:
+                _best_intent(all_embs, all_embs[0], reduce_idx)
+
+            # Per-intent views into the stacked matrix (for introspection)
+            bounds = np.append(reduce_idx, len(all_embs))
+            views = {
+                name: all_embs[bounds[i]:bounds[i + 1]]
+                for i, name in enumerate(intent_names)
+            }
+
+            _MODEL = model
+            _EXAMPLE_EMBEDDINGS = (intent_names, reduce_idx, all_embs, views)
+
+    return _MODEL, _EXAMPLE_EMBEDDINGS
+
 
 class IntentClassifier:
     def __init__(self, data_root: Optional[str] = None):
-        # Load lightweight model (80MB, fast inference)
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-
-        # Example phrases for each intent (seed data)
-        self.examples = {
-            "add_wish": [
-                "I wish we had",
-                "would be nice if",
-                "can we add",
-                "idea for",
-                "we should build",
-                "it would help if",
-                "we need a way to",
-                "feature request",
-            ],
-            "log_issue": [
-                "there's a bug",
-                "broken",
-                "error when",
-                "fails to",
-                "not working",
-                "crashed",
-                "exception in",
-                "something wrong with",
-            ],
-            "log_friction": [
-                "annoying that",
-                "keeps happening",
-                "painful to",
-                "frustrating",
-                "slows me down",
-                "every time I have to",
-                "tedious",
-                "friction point",
-            ],
-            "log_crit": [
-                "I noticed",
-                "observation",
-                "the design feels",
-                "UI looks",
-                "feels off",
-                "visually",
-                "the layout",
-                "spacing seems",
-            ],
-            "record_learning": [
-                "I learned",
-                "TIL",
-                "figured out",
-                "turns out",
-                "the trick is",
-                "gotcha",
-                "lesson learned",
-                "discovered that",
-            ],
-            "search": [
-                "find",
-                "where is",
-                "show me",
-                "look up",
-                "search for",
-                "what is the status of",
-            ],
-            "ask_oracle": [
-                "what should I work on",
-                "project status",
-                "roadmap",
-                "health check",
-                "priorities",
-                "next actions",
-            ],
-        }
-
-        # Pre-compute embeddings for all examples
-        self.example_embeddings = {
-            intent: self.model.encode(phrases)
-            for intent, phrases in self.examples.items()
-        }
+        # Model and example embeddings are shared process-wide; only the
+        # per-root state (log path, counters, writer) is per-instance
+        self.model, shared = _shared_model_state()
+        self._intent_names, self._reduce_idx, self._all_embs, self.example_embeddings = shared
+        self.examples = EXAMPLES
 
         # Training data log path
         if data_root:
@@ -105,6 +333,22 @@ class IntentClassifier:
             self.training_log = Path(".decibel/ml/training_samples.jsonl")
         self.training_log.parent.mkdir(parents=True, exist_ok=True)
 
+        # Serialize appends to the training log; the HTTP server handles
+        # requests on multiple threads.
+        self._log_lock = threading.Lock()
+
+        # Rolling-counters sidecar so get_training_stats() is O(1) instead
+        # of re-parsing the whole training log per call.
+        self.stats_path = self.training_log.with_name("training_stats.json")
+        self._stats = self._load_stats()
+
+        # Samples are appended by a background writer that keeps the file
+        # handle open and flushes in batches, instead of an open/write/
+        # close syscall round-trip per /log request.
+        self._write_q = queue.Queue()
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        atexit.register(self._drain_writes)
+
     def classify(self, transcript: str) -> Tuple[str, float]:
         """
         Classify a transcript into an intent category.
@@ -112,24 +356,69 @@ class IntentClassifier:
         Returns:
             tuple: (intent_name, confidence_score)
         """
-        # Encode the input transcript
-        emb = self.model.encode(transcript)
+        # Keyword prefilter: a distinctive substring answers without
+        # invoking the transformer at all
+        hit = self.keyword_intent(transcript)
+        if hit is not None:
+            return hit
 
-        best_intent = "unknown"
-        best_score = 0.0
+        # Encode the input transcript (unit-norm, so cosine == dot product)
+        q = np.ascontiguousarray(
+            self.model.encode(transcript, normalize_embeddings=True),
+            dtype=np.float32,
+        )
+        return self._classify_embedding(q)
 
-        for intent, example_embs in self.example_embeddings.items():
-            # Compute cosine similarity with all examples for this intent
-            sims = np.dot(example_embs, emb) / (
-                np.linalg.norm(example_embs, axis=1) * np.linalg.norm(emb)
-            )
-            max_sim = float(np.max(sims))
+    def keyword_intent(self, transcript: str) -> Optional[Tuple[str, float]]:
+        """Keyword fast path: return (intent, KEYWORD_CONFIDENCE) or None."""
+        match = _KEYWORD_RE.search(transcript.lower())
+        if match:
+            return KEYWORDS[match.group(1)], KEYWORD_CONFIDENCE
+        return None
+
+    def _classify_embedding(self, q: np.ndarray) -> Tuple[str, float]:
+        """Classify a pre-encoded, unit-norm query embedding."""
+        if _best_intent is not None:
+            best, score = _best_intent(self._all_embs, q, self._reduce_idx)
+            return self._intent_names[best], float(score)
 
-            if max_sim > best_score:
-                best_score = max_sim
-                best_intent = intent
+        # One GEMV against the stacked example matrix, then collapse to a
+        # per-intent max with a single reduceat.
+        sims = self._all_embs @ q
+        per_intent_max = np.maximum.reduceat(sims, self._reduce_idx)
+        best = int(per_intent_max.argmax())
 
-        return best_intent, best_score
+        return self._intent_names[best], float(per_intent_max[best])
+
+    def classify_batch(self, transcripts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Classify many transcripts at once.
+
+        One batched encode plus one (B, N_examples) matmul replaces the
+        per-item Python overhead of calling classify() in a loop.
+
+        Returns:
+            list of (intent_name, confidence_score) tuples, in input order
+        """
+        # Same keyword fast path as classify(), so the two entry points
+        # can't disagree on the same transcript; only misses hit the model
+        results = [self.keyword_intent(transcript) for transcript in transcripts]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            Q = self.model.encode(
+                [transcripts[i] for i in misses],
+                batch_size=64,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+            sims = Q @ self._all_embs.T
+            per_intent = np.maximum.reduceat(sims, self._reduce_idx, axis=1)
+            idx = per_intent.argmax(axis=1)
+            for b, i in enumerate(misses):
+                best = int(idx[b])
+                results[i] = (self._intent_names[best], float(per_intent[b, best]))
+
+        return results
 
     def log_sample(
         self,
@@ -154,34 +443,124 @@ class IntentClassifier:
             "ts": datetime.utcnow().isoformat() + "Z"
         }
 
-        with open(self.training_log, "a") as f:
-            f.write(json.dumps(sample) + "\n")
+        with self._log_lock:
+            self._count_sample(self._stats, sample)
+        self._write_q.put(sample)
 
-    def get_training_stats(self) -> dict:
-        """Get statistics on collected training samples."""
-        if not self.training_log.exists():
-            return {"total": 0, "accuracy": 0, "by_intent": {}}
+    def _writer_loop(self):
+        """Drain queued samples into the training log in batches.
 
-        total = 0
-        correct = 0
-        by_intent = {}
+        The loop must outlive I/O failures (directory removed, disk
+        full): a dead writer would queue samples forever and hang the
+        atexit drain. Failed batches are dropped with a warning and the
+        handle is reopened on the next batch.
+        """
+        if orjson is not None:
+            dumps = lambda s: orjson.dumps(s).decode()
+        else:
+            dumps = json.dumps
 
-        with open(self.training_log) as f:
-            for line in f:
+        f = None
+        while True:
+            batch = [self._write_q.get()]
+            while True:
                 try:
-                    sample = json.loads(line)
-                    total += 1
-                    if sample.get("correct"):
-                        correct += 1
-
-                    label = sample.get("user_label", "unknown")
-                    if label not in by_intent:
-                        by_intent[label] = {"total": 0, "correct": 0}
-                    by_intent[label]["total"] += 1
-                    if sample.get("correct"):
-                        by_intent[label]["correct"] += 1
-                except:
-                    pass
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                if f is None:
+                    f = open(self.training_log, "a", buffering=1 << 16)
+                for sample in batch:
+                    f.write(dumps(sample) + "\n")
+                f.flush()
+
+                with self._log_lock:
+                    self._write_stats()
+            except Exception as e:
+                print(f"[intent-classifier] training log write failed, dropping {len(batch)} sample(s): {e}", file=sys.stderr)
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+                    f = None
+            finally:
+                # Always account for the batch so the atexit join can't
+                # wait on samples that will never be written
+                for _ in batch:
+                    self._write_q.task_done()
+
+    def _drain_writes(self, timeout: float = 5.0):
+        """Wait (bounded) for queued samples to hit disk (atexit hook)."""
+        waiter = threading.Thread(target=self._write_q.join, daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+
+    @staticmethod
+    def _count_sample(stats: dict, sample: dict):
+        """Fold one sample into the rolling counters."""
+        correct = bool(sample.get("correct"))
+        stats["total"] += 1
+        if correct:
+            stats["correct"] += 1
+
+        label = sample.get("user_label", "unknown")
+        intent = stats["by_intent"].setdefault(label, {"total": 0, "correct": 0})
+        intent["total"] += 1
+        if correct:
+            intent["correct"] += 1
+
+    def _load_stats(self) -> dict:
+        """Load counters from the sidecar, rebuilding from the log if missing."""
+        if self.stats_path.exists():
+            try:
+                with open(self.stats_path, "rb") as f:
+                    return json.loads(f.read())
+            except (ValueError, OSError):
+                pass
+        return self._scan_training_log()
+
+    def _scan_training_log(self) -> dict:
+        """Rebuild counters with a full pass over the training log (legacy path)."""
+        stats = {"total": 0, "correct": 0, "by_intent": {}}
+        if not self.training_log.exists() or self.training_log.stat().st_size == 0:
+            return stats
+
+        # orjson parses roughly 3x faster than stdlib json on this path,
+        # and accepts raw bytes directly. mmap lets us read lines straight
+        # out of the page cache without Python-level line buffering.
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(self.training_log, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for raw in iter(mm.readline, b""):
+                    try:
+                        sample = loads(raw)
+                    except ValueError:
+                        continue
+                    self._count_sample(stats, sample)
+            finally:
+                mm.close()
+        return stats
+
+    def _write_stats(self):
+        """Atomically persist the counters sidecar (caller holds _log_lock)."""
+        tmp = self.stats_path.with_name(self.stats_path.name + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(json.dumps(self._stats))
+        os.replace(tmp, self.stats_path)
+
+    def get_training_stats(self) -> dict:
+        """Get statistics on collected training samples."""
+        with self._log_lock:
+            total = self._stats["total"]
+            correct = self._stats["correct"]
+            by_intent = {
+                label: dict(counts)
+                for label, counts in self._stats["by_intent"].items()
+            }
 
         return {
             "total": total,
@@ -190,21 +569,23 @@ class IntentClassifier:
         }
 
 
-# Singleton instance
-_classifier: Optional[IntentClassifier] = None
+# One instance per data_root; the heavy model state is shared, so extra
+# instances only cost a log path and counters
+@lru_cache(maxsize=None)
+def _classifier_for_root(resolved_root: str) -> IntentClassifier:
+    return IntentClassifier(resolved_root)
+
 
 def get_classifier(data_root: Optional[str] = None) -> IntentClassifier:
-    """Get or create the singleton classifier instance."""
-    global _classifier
-    if _classifier is None:
-        _classifier = IntentClassifier(data_root)
-    return _classifier
+    """Get or create the classifier instance for a data root."""
+    # Resolve before caching: None, ".", the cwd, and trailing-slash
+    # variants all name the same root and must share one instance (two
+    # instances would race a pair of writer threads on one training log)
+    return _classifier_for_root(str(Path(data_root or ".").resolve()))
 
 
 # CLI for testing
 if __name__ == "__main__":
-    import sys
-
     classifier = get_classifier()
 
     if len(sys.argv) > 1:
@@ -10,16 +10,108 @@ Usage:
 
 import argparse
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import queue
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from intent_classifier import get_classifier, IntentClassifier
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+# orjson is 3-5x faster and emits bytes directly, skipping the
+# intermediate str + UTF-8 encode on every response
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+    _loads = json.loads
+
 classifier: IntentClassifier = None
 
+# /health is polled constantly; serialize its body once at module load
+_HEALTH_BODY = _dumps({"status": "ok", "model": "all-MiniLM-L6-v2"})
+
+# Micro-batching: concurrent /classify requests within a short coalesce
+# window are encoded as a single batch. Transformer throughput scales
+# near-linearly with batch size on CPU, so p50 stays flat under load
+# while throughput multiplies.
+BATCH_MAX = 32
+BATCH_WAIT_MS = 8
+
+_classify_queue: "queue.Queue" = queue.Queue()
+
+
+class _PendingClassify:
+    __slots__ = ("transcript", "event", "result", "error")
+
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _batch_worker():
+    """Drain queued transcripts and encode them as one batch."""
+    while True:
+        batch = [_classify_queue.get()]
+        # One absolute deadline for the whole window — a per-item timeout
+        # would restart the clock on every arrival and let the first
+        # request wait up to BATCH_MAX windows under steady traffic
+        deadline = time.monotonic() + BATCH_WAIT_MS / 1000
+        while len(batch) < BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(_classify_queue.get(timeout=remaining))
+                else:
+                    batch.append(_classify_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            embeddings = classifier.model.encode(
+                [item.transcript for item in batch],
+                normalize_embeddings=True,
+                batch_size=len(batch),
+            )
+            for item, emb in zip(batch, embeddings):
+                item.result = classifier._classify_embedding(emb)
+        except Exception as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.event.set()
+
+
+def _classify_via_batch(transcript: str):
+    """Enqueue a transcript and wait for the batch worker's answer."""
+    # Keyword hits skip the batching queue entirely
+    hit = classifier.keyword_intent(transcript)
+    if hit is not None:
+        return hit
+
+    pending = _PendingClassify(transcript)
+    _classify_queue.put(pending)
+    pending.event.wait()
+    if pending.error is not None:
+        raise pending.error
+    return pending.result
+
 
 class ClassifierHandler(BaseHTTPRequestHandler):
     def do_POST(self):
         if self.path == "/classify":
             self._handle_classify()
+        elif self.path == "/classify_batch":
+            self._handle_classify_batch()
         elif self.path == "/log":
             self._handle_log()
         else:
@@ -27,7 +119,7 @@ class ClassifierHandler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         if self.path == "/health":
-            self._send_json(200, {"status": "ok", "model": "all-MiniLM-L6-v2"})
+            self._send_bytes(200, _HEALTH_BODY)
         elif self.path == "/stats":
             self._send_json(200, classifier.get_training_stats())
         else:
@@ -36,18 +128,41 @@ class ClassifierHandler(BaseHTTPRequestHandler):
     def _handle_classify(self):
         try:
             content_length = int(self.headers.get('Content-Length', 0))
-            body = json.loads(self.rfile.read(content_length))
+            body = _loads(self.rfile.read(content_length))
 
             transcript = body.get("transcript", "")
             if not transcript:
                 self._send_json(400, {"error": "Missing transcript"})
                 return
 
-            intent, confidence = classifier.classify(transcript)
+            intent, confidence = _classify_via_batch(transcript)
 
+            # No rounding here: log_sample already rounds for the training
+            # log, and clients format for display themselves
             self._send_json(200, {
                 "intent": intent,
-                "confidence": round(confidence, 4)
+                "confidence": confidence
+            })
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _handle_classify_batch(self):
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = _loads(self.rfile.read(content_length))
+
+            transcripts = body.get("transcripts", [])
+            if not transcripts:
+                self._send_json(400, {"error": "Missing transcripts"})
+                return
+
+            results = classifier.classify_batch(transcripts)
+
+            self._send_json(200, {
+                "results": [
+                    {"intent": intent, "confidence": confidence}
+                    for intent, confidence in results
+                ]
             })
         except Exception as e:
             self._send_json(500, {"error": str(e)})
@@ -55,7 +170,7 @@ class ClassifierHandler(BaseHTTPRequestHandler):
     def _handle_log(self):
         try:
             content_length = int(self.headers.get('Content-Length', 0))
-            body = json.loads(self.rfile.read(content_length))
+            body = _loads(self.rfile.read(content_length))
 
             classifier.log_sample(
                 transcript=body.get("transcript", ""),
@@ -70,11 +185,14 @@ class ClassifierHandler(BaseHTTPRequestHandler):
             self._send_json(500, {"error": str(e)})
 
     def _send_json(self, status: int, data: dict):
+        self._send_bytes(status, _dumps(data))
+
+    def _send_bytes(self, status: int, payload: bytes):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(payload)
 
     def log_message(self, format, *args):
         # Quieter logging
@@ -94,9 +212,11 @@ def main():
     classifier = get_classifier(args.data_root)
     print(f"[intent-classifier] Model loaded, starting server on port {args.port}")
 
-    server = HTTPServer(("127.0.0.1", args.port), ClassifierHandler)
+    threading.Thread(target=_batch_worker, daemon=True).start()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), ClassifierHandler)
     print(f"[intent-classifier] Ready at http://127.0.0.1:{args.port}")
-    print(f"[intent-classifier] Endpoints: POST /classify, POST /log, GET /health, GET /stats")
+    print(f"[intent-classifier] Endpoints: POST /classify, POST /classify_batch, POST /log, GET /health, GET /stats")
 
     try:
         server.serve_forever()